@@ -1,365 +1,1823 @@
-import csv
-import re
-import os
-import json
-import time
-import random
-import smtplib
-import socket
-import ssl
-from email.mime.base import MIMEBase
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email import encoders
-
-# Constants
-JSON_EXTENSION = '.json'
-TEMPLATE_DIR = "templates"
-os.makedirs(TEMPLATE_DIR, exist_ok=True)
-DEFAULT_TIMEOUT = 15  # Increased timeout for slow connections
-
-
-def _connect_smtp(smtp_config):
-    """
-    Create and return an smtplib connection with timeout + correct SSL/TLS handling.
-    """
-    host = smtp_config.get('server', '')
-    port = int(smtp_config.get('port', 0) or 0)
-    use_ssl = bool(smtp_config.get('ssl', port == 465))
-    use_tls = bool(smtp_config.get('tls', port != 465 and port != 25))
-
-    # Basic sanity checks to catch common misconfigurations early (gives clearer GUI feedback)
-    if port == 465 and not use_ssl:
-        raise Exception("Port 465 requires SSL. Enable 'Use SSL' or switch to port 587 for STARTTLS.")
-    if port == 587 and use_ssl:
-        raise Exception("Port 587 typically uses STARTTLS (TLS checkbox) not direct SSL. Disable 'Use SSL' and enable 'Use TLS'.")
-    if port == 25 and (use_ssl or use_tls):
-        # Not always wrong, but often confusing for users. Provide guidance instead of blocking.
-        pass
-
-    # Test if we can even reach the server first
-    try:
-        # Test basic connectivity
-        test_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        test_socket.settimeout(DEFAULT_TIMEOUT)
-        test_socket.connect((host, port))
-        test_socket.close()
-    except (socket.timeout, socket.gaierror, ConnectionRefusedError, OSError) as e:
-        raise Exception(f"Cannot reach SMTP server {host}:{port}. Error: {str(e)}")
-
-    try:
-        if use_ssl:
-            # For SSL connections
-            context = ssl.create_default_context()
-            server = smtplib.SMTP_SSL(host, port, timeout=DEFAULT_TIMEOUT, context=context)
-        else:
-            # For non-SSL connections
-            server = smtplib.SMTP(host, port, timeout=DEFAULT_TIMEOUT)
-        # Optional: debug level (set to 0 in production to reduce noise)
-        server.set_debuglevel(0)
-
-        # Identify ourselves to the SMTP server
-        server.ehlo()
-
-        # Start TLS if requested and server supports it
-        if use_tls and server.has_extn('STARTTLS'):
-            server.starttls()
-            server.ehlo()  # Re-identify ourselves after TLS negotiation
-
-        return server
-    except smtplib.SMTPConnectError as e:
-        raise Exception(f"Connection to SMTP server failed: {str(e)}")
-    except smtplib.SMTPException as e:
-        raise Exception(f"SMTP error: {str(e)}")
-    except Exception as e:
-        raise Exception(f"Failed to connect to SMTP server: {str(e)}")
-
-
-def load_emails_from_csv(file_path):
-    """Load emails from CSV file with improved parsing."""
-    emails = []
-    try:
-        with open(file_path, 'r', encoding='utf-8-sig') as f:
-            # Try different delimiters
-            for delimiter in [',', ';', '\t']:
-                try:
-                    f.seek(0)  # Reset file pointer
-                    reader = csv.reader(f, delimiter=delimiter)
-                    for row in reader:
-                        for item in row:
-                            item = item.strip()
-                            if is_valid_email(item):
-                                emails.append(item)
-                    break  # Success with this delimiter
-                except csv.Error:
-                    continue
-    except (IOError, OSError, csv.Error) as e:
-        print(f"Error loading CSV: {e}")
-    return emails
-
-
-def load_emails_from_txt(file_path):
-    """Load emails from TXT file."""
-    emails = []
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                email = line.strip()
-                if is_valid_email(email):
-                    emails.append(email)
-    except (IOError, OSError) as e:
-        print(f"Error loading TXT: {e}")
-    return emails
-
-
-def load_emails(file_path):
-    """Load emails from CSV/TXT and validate format."""
-    if not file_path or not os.path.exists(file_path):
-        return []
-
-    if file_path.lower().endswith('.csv'):
-        emails = load_emails_from_csv(file_path)
-    else:
-        emails = load_emails_from_txt(file_path)
-
-    return list(set(emails))  # Remove duplicates
-
-
-def is_valid_email(email):
-    """Improved regex email validation."""
-    if not email or not isinstance(email, str):
-        return False
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
-
-
-def create_email_message(smtp_config, recipient, subject, body, attachments=None):
-    """Create a MIME email message with optional attachments."""
-    msg = MIMEMultipart("related")
-    msg['From'] = smtp_config['email']
-    msg['To'] = recipient
-    msg['Subject'] = subject
-
-    alt = MIMEMultipart("alternative")
-    msg.attach(alt)
-
-    alt.attach(MIMEText("This is an HTML email. Please view in HTML capable client.", "plain"))
-    alt.attach(MIMEText(body, "html"))
-
-    if attachments:
-        for file_path in attachments:
-            try:
-                if os.path.exists(file_path):
-                    with open(file_path, 'rb') as f:
-                        part = MIMEBase('application', "octet-stream")
-                        part.set_payload(f.read())
-                        encoders.encode_base64(part)
-                        filename = os.path.basename(file_path)
-                        part.add_header('Content-Disposition', f'attachment; filename="{filename}"')
-                        msg.attach(part)
-            except (IOError, OSError) as e:
-                print(f"Attachment error: {e}")
-    return msg
-
-
-def send_email(smtp_config, recipient, subject, body, attachments=None):
-    """Send a single email."""
-    msg = create_email_message(smtp_config, recipient, subject, body, attachments)
-
-    server = None
-    try:
-        server = _connect_smtp(smtp_config)
-        if smtp_config.get('email') and smtp_config.get('password'):
-            server.login(smtp_config['email'], smtp_config['password'])
-        server.send_message(msg)
-        return True, None
-    except (smtplib.SMTPException, OSError, Exception) as e:
-        return False, str(e)
-    finally:
-        try:
-            if server:
-                server.quit()
-        except smtplib.SMTPException:
-            pass
-
-
-def bulk_send(smtp_config, email_list, subject, body, attachments=None, delay_range=(2, 5), retry_failed=True):
-    """Send emails in bulk with delay and retry logic."""
-    logs = []
-    total = len(email_list)
-    for i, recipient in enumerate(email_list):
-        success, error = send_email(smtp_config, recipient, subject, body, attachments)
-        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-        status = "Sent" if success else f"Failed: {error}"
-        logs.append({'timestamp': timestamp, 'recipient': recipient, 'status': status})
-
-        if i < total - 1:  # Don't sleep after the last email
-            time.sleep(random.uniform(*delay_range))
-
-        if retry_failed and not success:
-            time.sleep(random.uniform(1, 3))
-            success, error = send_email(smtp_config, recipient, subject, body, attachments)
-            timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-            status = "Sent (Retry)" if success else f"Failed (Retry): {error}"
-            logs.append({'timestamp': timestamp, 'recipient': recipient, 'status': status})
-    return logs
-
-
-def inline_image(file_path, width=400):
-    """Return HTML tag for inline newsletter image."""
-    if os.path.exists(file_path):
-        return f'<img src="file://{os.path.abspath(file_path)}" width="{width}"><br>'
-    return ""
-
-
-def save_template(name, subject, body, attachments=None):
-    """Save template locally as JSON."""
-    if not name.endswith(JSON_EXTENSION):
-        name += JSON_EXTENSION
-
-    filename = os.path.basename(name)
-    filepath = os.path.join(TEMPLATE_DIR, filename)
-
-    data = {
-        "name": filename,
-        "subject": subject,
-        "body": body,
-        "attachments": attachments or []
-    }
-    try:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
-        return True
-    except (IOError, OSError) as e:
-        print(f"Error saving template: {e}")
-        return False
-
-
-def load_templates():
-    """Load all saved templates."""
-    templates = []
-    try:
-        for f in os.listdir(TEMPLATE_DIR):
-            if f.endswith(JSON_EXTENSION):
-                path = os.path.join(TEMPLATE_DIR, f)
-                with open(path, 'r', encoding='utf-8') as file:
-                    template_data = json.load(file)
-                    templates.append(template_data)
-    except (IOError, OSError, json.JSONDecodeError) as e:
-        print(f"Error loading templates: {e}")
-    return templates
-
-
-def delete_template(name):
-    """Delete a saved template."""
-    if not name.endswith(JSON_EXTENSION):
-        name += JSON_EXTENSION
-
-    path = os.path.join(TEMPLATE_DIR, name)
-    if os.path.exists(path):
-        os.remove(path)
-        return True
-    return False
-
-
-def get_template_by_name(name):
-    """Get a specific template by name."""
-    templates = load_templates()
-    for template in templates:
-        if template["name"] == name:
-            return template
-    return None
-
-
-def validate_smtp_config(smtp_config):
-    """Validate SMTP configuration by attempting to connect."""
-    server = None
-    try:
-        server = _connect_smtp(smtp_config)
-        if smtp_config.get('email') and smtp_config.get('password'):
-            server.login(smtp_config['email'], smtp_config['password'])
-        try:
-            server.noop()
-        except smtplib.SMTPException:
-            pass
-        return True, "SMTP configuration is valid"
-    except (smtplib.SMTPException, OSError, Exception) as e:
-        return False, f"SMTP validation failed: {str(e)}"
-    finally:
-        try:
-            if server:
-                server.quit()
-        except smtplib.SMTPException:
-            pass
-
-
-def export_logs_to_csv(logs, filename):
-    """Export logs to a CSV file."""
-    try:
-        with open(filename, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=['timestamp', 'recipient', 'status'])
-            writer.writeheader()
-            for log in logs:
-                writer.writerow(log)
-        return True
-    except (IOError, OSError) as e:
-        print(f"Error exporting logs: {e}")
-        return False
-
-
-def clean_email_list(email_list):
-    """Clean and validate a list of email addresses."""
-    cleaned_emails = []
-    for email in email_list:
-        if isinstance(email, str) and is_valid_email(email.strip()):
-            cleaned_emails.append(email.strip())
-    return list(set(cleaned_emails))
-
-
-def count_emails_in_file(file_path):
-    """Count valid emails in a file without loading them all."""
-    if not file_path or not os.path.exists(file_path):
-        return 0
-
-    try:
-        if file_path.lower().endswith('.csv'):
-            return _count_emails_csv(file_path)
-        else:
-            return _count_emails_txt(file_path)
-    except (IOError, OSError) as e:
-        print(f"Error counting emails: {e}")
-        return 0
-
-
-def _count_emails_csv(file_path):
-    """Count emails in CSV file with improved parsing."""
-    count = 0
-    try:
-        with open(file_path, 'r', encoding='utf-8-sig') as f:
-            for delimiter in [',', ';', '\t']:
-                try:
-                    f.seek(0)  # Reset file pointer
-                    reader = csv.reader(f, delimiter=delimiter)
-                    for row in reader:
-                        for item in row:
-                            if is_valid_email(item.strip()):
-                                count += 1
-                    break
-                except csv.Error:
-                    continue
-    except (IOError, OSError) as e:
-        print(f"Error counting CSV emails: {e}")
-    return count
-
-
-def _count_emails_txt(file_path):
-    """Count emails in text file."""
-    count = 0
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                if is_valid_email(line.strip()):
-                    count += 1
-    except (IOError, OSError) as e:
-        print(f"Error counting TXT emails: {e}")
-    return count
+import asyncio
+import base64
+import csv
+import re
+import os
+import mmap
+import json
+import time
+import random
+import smtplib
+import socket
+import ssl
+import threading
+import queue
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from email.mime.base import MIMEBase
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+from email import policy as email_policy
+
+# pandas is deliberately not imported here: it is by far the heaviest
+# import in requirements.txt, and the GUI pays every module-level import
+# in this file at startup via `import backend`. _pandas() pulls it in on
+# the first large-CSV operation instead.
+_pd = False  # False: import not yet attempted; None: unavailable
+
+
+def _pandas():
+    """Return the pandas module, importing it on first call (or None)."""
+    global _pd
+    if _pd is False:
+        try:
+            import pandas
+            _pd = pandas
+        except ImportError:  # pandas is in requirements.txt but keep a stdlib fallback
+            _pd = None
+    return _pd
+
+try:
+    import aiosmtplib
+except ImportError:  # optional: only needed for async_bulk_send
+    aiosmtplib = None
+
+try:
+    import re2  # google-re2: non-backtracking DFA engine, optional
+except ImportError:
+    re2 = None
+
+try:
+    import pybase64  # SIMD (AVX2/SSSE3) base64 codec, optional
+except ImportError:
+    pybase64 = None
+
+# orjson (SIMD-accelerated C encoder) when available — templates can carry
+# large HTML bodies, where the stdlib encoder is measurably slower. Both
+# helpers speak bytes so the two backends are interchangeable.
+try:
+    import orjson
+
+    def _json_dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj):
+        return json.dumps(obj, indent=4, ensure_ascii=False).encode('utf-8')
+
+    _json_loads = json.loads
+
+# Constants
+JSON_EXTENSION = '.json'
+# Raised once: keeps csv from rejecting pathological rows and avoids
+# the per-row limit check tripping on huge concatenated cells.
+csv.field_size_limit(10_000_000)
+# Compiled once: is_valid_email runs per CSV cell / per line on large
+# imports, so the pattern must not be re-looked-up on every call.
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+# Bytes variant of _EMAIL_RE matching one whole line (tolerating the
+# surrounding whitespace that the str path strips). Used with mmap so TXT
+# scans never decode or allocate per-line strings.
+_EMAIL_LINE_RE = re.compile(
+    rb'(?m)^[ \t]*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})[ \t\r]*$'
+)
+
+# Unanchored token variant: finds email-shaped spans anywhere in a raw
+# buffer, so a big CSV can be scanned in one C-level regex pass without
+# parsing its row/cell structure at all.
+_EMAIL_TOKEN_RE = re.compile(rb'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}')
+
+# Same pattern compiled for google-re2 when available: its DFA engine is
+# far faster than backtracking re on multi-megabyte buffers.
+_EMAIL_LINE_RE_FAST = None
+if re2 is not None:
+    try:
+        _EMAIL_LINE_RE_FAST = re2.compile(_EMAIL_LINE_RE.pattern)
+    except Exception:
+        _EMAIL_LINE_RE_FAST = None
+
+# Below this size stdlib re wins; engine start-up cost dominates.
+_FAST_SCAN_MIN_BYTES = 1 << 20
+
+
+def _email_line_finditer(buf):
+    """Iterate email-line matches with the fastest available regex engine."""
+    if _EMAIL_LINE_RE_FAST is not None and len(buf) >= _FAST_SCAN_MIN_BYTES:
+        try:
+            return _EMAIL_LINE_RE_FAST.finditer(bytes(buf))
+        except Exception:
+            pass
+    return _EMAIL_LINE_RE.finditer(buf)
+TEMPLATE_DIR = "templates"
+os.makedirs(TEMPLATE_DIR, exist_ok=True)
+DEFAULT_TIMEOUT = 15  # Increased timeout for slow connections
+
+
+# Shared across every connection: building an SSLContext loads the CA
+# store from disk each time, and TLS session tickets (which make later
+# handshakes to the same server abbreviated) are only reused within one
+# context.
+_SSL_CONTEXT = None
+_SSL_CONTEXT_LOCK = threading.Lock()
+
+
+def _ssl_context():
+    """Return the process-wide TLS context, creating it on first use."""
+    global _SSL_CONTEXT
+    if _SSL_CONTEXT is None:
+        with _SSL_CONTEXT_LOCK:
+            if _SSL_CONTEXT is None:
+                _SSL_CONTEXT = ssl.create_default_context()
+    return _SSL_CONTEXT
+
+
+# Hostname -> (ip, expiry): the SMTP server is constant across a job, so
+# one getaddrinfo per TTL window replaces one per connection. Short TTL
+# keeps provider failover workable.
+_DNS_CACHE = {}
+_DNS_TTL = 300
+_DNS_LOCK = threading.Lock()
+
+
+def _resolve_host(host):
+    """Resolve a hostname once per TTL window; falls back to the name."""
+    now = time.monotonic()
+    with _DNS_LOCK:
+        entry = _DNS_CACHE.get(host)
+        if entry is not None and entry[1] > now:
+            return entry[0]
+    try:
+        ip = socket.gethostbyname(host)
+    except OSError:
+        # Let the connect path surface the real resolution error.
+        return host
+    with _DNS_LOCK:
+        _DNS_CACHE[host] = (ip, now + _DNS_TTL)
+    return ip
+
+
+def _connect_smtp(smtp_config, timeout=DEFAULT_TIMEOUT):
+    """
+    Create and return an smtplib connection with timeout + correct SSL/TLS handling.
+    """
+    _get = smtp_config.get  # one attribute lookup instead of four dict hashes
+    host = _get('server', '')
+    port = int(_get('port', 0) or 0)
+    use_ssl = bool(_get('ssl', port == 465))
+    use_tls = bool(_get('tls', port != 465 and port != 25))
+
+    # Basic sanity checks to catch common misconfigurations early (gives clearer GUI feedback)
+    if port == 465 and not use_ssl:
+        raise Exception("Port 465 requires SSL. Enable 'Use SSL' or switch to port 587 for STARTTLS.")
+    if port == 587 and use_ssl:
+        raise Exception("Port 587 typically uses STARTTLS (TLS checkbox) not direct SSL. Disable 'Use SSL' and enable 'Use TLS'.")
+    if port == 25 and (use_ssl or use_tls):
+        # Not always wrong, but often confusing for users. Provide guidance instead of blocking.
+        pass
+
+    # No separate reachability probe: smtplib's constructor performs the
+    # same TCP connect with the same timeout, so probing first just paid
+    # for a second handshake on every connection.
+    try:
+        address = _resolve_host(host)
+        if use_ssl:
+            # For SSL connections
+            server = smtplib.SMTP_SSL(timeout=timeout, context=_ssl_context())
+        else:
+            # For non-SSL connections
+            server = smtplib.SMTP(timeout=timeout)
+        # The socket dials the cached IP, but certificate verification
+        # (SNI/hostname check) must still see the real server name —
+        # smtplib reads it from _host when wrapping the socket.
+        server._host = host
+        server.connect(address, port)
+        # Optional: debug level (set to 0 in production to reduce noise)
+        server.set_debuglevel(0)
+
+        # Identify ourselves to the SMTP server
+        server.ehlo()
+
+        # Start TLS if requested and server supports it
+        if use_tls and server.has_extn('STARTTLS'):
+            server.starttls(context=_ssl_context())
+            server.ehlo()  # Re-identify ourselves after TLS negotiation
+
+        return server
+    except smtplib.SMTPConnectError as e:
+        raise Exception(f"Connection to SMTP server failed: {str(e)}")
+    except smtplib.SMTPException as e:
+        raise Exception(f"SMTP error: {str(e)}")
+    except (socket.timeout, socket.gaierror, ConnectionRefusedError, OSError) as e:
+        raise Exception(f"Cannot reach SMTP server {host}:{port}. Error: {str(e)}")
+    except Exception as e:
+        raise Exception(f"Failed to connect to SMTP server: {str(e)}")
+
+
+def _connect_and_login(smtp_config):
+    """Connect to the SMTP server and authenticate if credentials are set."""
+    server = _connect_smtp(smtp_config)
+    if smtp_config.get('email') and smtp_config.get('password'):
+        server.login(smtp_config['email'], smtp_config['password'])
+    return server
+
+
+def _sendmail_pipelined(server, from_addr, recipient, raw):
+    """Send one message using ESMTP PIPELINING when the server offers it.
+
+    smtplib's sendmail waits for a reply after each of MAIL FROM, RCPT TO
+    and DATA — three round-trips per message. With PIPELINING the three
+    commands go out in one write and their replies are read back
+    together, so a message costs one command round-trip plus the DATA
+    payload. Falls back to the lock-step sendmail when the extension is
+    not advertised.
+    """
+    # Declaring BODY=8BITMIME where the server advertises it keeps the
+    # transaction honest if a message ever carries raw 8-bit content
+    # (RFC 6152); servers without the extension get a plain MAIL FROM.
+    esmtp = getattr(server, 'does_esmtp', False)
+    body_param = ' BODY=8BITMIME' if esmtp and server.has_extn('8bitmime') else ''
+    if not esmtp or not server.has_extn('pipelining'):
+        mail_options = ['BODY=8BITMIME'] if body_param else []
+        server.sendmail(from_addr, [recipient], raw, mail_options=mail_options)
+        return
+
+    server.send(
+        f'mail FROM:<{from_addr}>{body_param}\r\nrcpt TO:<{recipient}>\r\ndata\r\n'
+    )
+    mail_code, mail_msg = server.getreply()
+    rcpt_code, rcpt_msg = server.getreply()
+    data_code, data_msg = server.getreply()
+
+    if data_code != 354:
+        # RFC 2920: a failed MAIL/RCPT makes the server reject DATA too,
+        # so the session is already back in sync — just report the cause.
+        if mail_code != 250:
+            raise smtplib.SMTPSenderRefused(mail_code, mail_msg, from_addr)
+        if rcpt_code not in (250, 251):
+            raise smtplib.SMTPRecipientsRefused({recipient: (rcpt_code, rcpt_msg)})
+        raise smtplib.SMTPDataError(data_code, data_msg)
+
+    # Dot-stuff and terminate exactly as smtplib's data() does.
+    payload = re.sub(rb'(?m)^\.', b'..', raw)
+    if not payload.endswith(b'\r\n'):
+        payload += b'\r\n'
+    server.send(payload + b'.\r\n')
+    final_code, final_msg = server.getreply()
+    if mail_code != 250:
+        raise smtplib.SMTPSenderRefused(mail_code, mail_msg, from_addr)
+    if rcpt_code not in (250, 251):
+        raise smtplib.SMTPRecipientsRefused({recipient: (rcpt_code, rcpt_msg)})
+    if final_code != 250:
+        raise smtplib.SMTPDataError(final_code, final_msg)
+
+
+class _SmtpPool:
+    """Bounded pool of authenticated SMTP connections keyed by config.
+
+    Keeping connections alive between bulk_send/send_email calls avoids
+    paying the TLS handshake + LOGIN again for bursty workloads. Idle
+    connections are evicted by a background timer after IDLE_TTL seconds.
+    """
+
+    MAX_PER_KEY = 5
+    IDLE_TTL = 100  # seconds
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._idle = {}  # key -> deque of (server, last_used)
+        self._purge_timer = None
+
+    @staticmethod
+    def _key(smtp_config):
+        return (
+            smtp_config.get('server', ''),
+            int(smtp_config.get('port', 0) or 0),
+            smtp_config.get('email', ''),
+            bool(smtp_config.get('ssl', False)),
+            bool(smtp_config.get('tls', False)),
+        )
+
+    def checkout(self, smtp_config):
+        """Return a live connection from the pool, or open a new one."""
+        key = self._key(smtp_config)
+        while True:
+            with self._lock:
+                bucket = self._idle.get(key)
+                if not bucket:
+                    break
+                server, last_used = bucket.pop()
+            if time.monotonic() - last_used > self.IDLE_TTL:
+                self._drop(server)
+                continue
+            # Validate before handing out; a dead connection here is cheaper
+            # to detect with NOOP than with a failed DATA transaction later.
+            try:
+                server.noop()
+                return server
+            except (smtplib.SMTPException, OSError):
+                self._drop(server)
+        return _connect_and_login(smtp_config)
+
+    def checkin(self, smtp_config, server):
+        """Return a connection to the pool (or close it if the pool is full).
+
+        A cheap RSET clears any half-finished transaction state before the
+        connection is parked; if even that fails the connection is dropped
+        rather than poisoning the pool. QUIT is never issued on this hot
+        path — full teardown happens only on eviction.
+        """
+        try:
+            server.rset()
+        except (smtplib.SMTPException, OSError):
+            self._drop(server)
+            return
+        key = self._key(smtp_config)
+        with self._lock:
+            bucket = self._idle.setdefault(key, deque())
+            if len(bucket) < self.MAX_PER_KEY:
+                bucket.append((server, time.monotonic()))
+                self._schedule_purge()
+                return
+        self._drop(server)
+
+    @contextmanager
+    def acquire(self, smtp_config):
+        """Context manager yielding a pooled connection.
+
+        The connection goes back to the pool on clean exit and is dropped
+        if the block raised (its protocol state is then suspect).
+        """
+        server = self.checkout(smtp_config)
+        try:
+            yield server
+        except Exception:
+            self._drop(server)
+            raise
+        else:
+            self.checkin(smtp_config, server)
+
+    @staticmethod
+    def _drop(server):
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+
+    def _schedule_purge(self):
+        # Caller holds self._lock.
+        if self._purge_timer is None:
+            self._purge_timer = threading.Timer(self.IDLE_TTL / 2, self._purge)
+            self._purge_timer.daemon = True
+            self._purge_timer.start()
+
+    def _purge(self):
+        """Close idle connections that exceeded their TTL."""
+        expired = []
+        with self._lock:
+            self._purge_timer = None
+            now = time.monotonic()
+            for key, bucket in list(self._idle.items()):
+                keep = deque()
+                for server, last_used in bucket:
+                    if now - last_used > self.IDLE_TTL:
+                        expired.append(server)
+                    else:
+                        keep.append((server, last_used))
+                if keep:
+                    self._idle[key] = keep
+                else:
+                    del self._idle[key]
+            if self._idle:
+                self._schedule_purge()
+        for server in expired:
+            self._drop(server)
+
+
+_POOL = _SmtpPool()
+
+
+class _SmtpSession:
+    """Context manager owning a single authenticated SMTP connection.
+
+    Opening a TLS connection and logging in is by far the most expensive part
+    of sending a message, so bulk sends should do it once and reuse the
+    session for every recipient instead of reconnecting per email.
+    """
+
+    # Health-check the connection with a NOOP every this many sends.
+    NOOP_INTERVAL = 25
+    # Rotate the connection after this many messages. Providers commonly
+    # cap messages per connection around this mark; reconnecting on our
+    # schedule beats being dropped mid-DATA on theirs.
+    MAX_PER_CONNECTION = 100
+
+    def __init__(self, smtp_config):
+        self.smtp_config = smtp_config
+        self.server = None
+        self._sends_since_noop = 0
+        self._sends_on_connection = 0
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+        return False
+
+    def connect(self):
+        """Borrow an authenticated connection from the module pool."""
+        self.server = _POOL.checkout(self.smtp_config)
+        self._sends_since_noop = 0
+        self._sends_on_connection = 0
+
+    def reconnect(self):
+        """Drop the current (bad) connection and borrow a fresh one."""
+        self._drop()
+        self.connect()
+
+    def close(self):
+        """Return a healthy connection to the pool for later reuse."""
+        if self.server is not None:
+            _POOL.checkin(self.smtp_config, self.server)
+            self.server = None
+
+    def _drop(self):
+        """Quit the connection, swallowing errors from dead sockets."""
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.server = None
+
+    def _before_send(self):
+        """Pre-send bookkeeping: connect, rotate, and health-check."""
+        if self.server is None:
+            self.connect()
+
+        # Proactive rotation once the per-connection budget is spent.
+        self._sends_on_connection += 1
+        if self._sends_on_connection > self.MAX_PER_CONNECTION:
+            self.reconnect()
+            self._sends_on_connection = 1
+            return
+
+        # Periodic NOOP health check so a silently-dead connection is
+        # detected before we waste a DATA transaction on it.
+        self._sends_since_noop += 1
+        if self._sends_since_noop >= self.NOOP_INTERVAL:
+            self._sends_since_noop = 0
+            try:
+                self.server.noop()
+            except (smtplib.SMTPException, OSError):
+                self.reconnect()
+
+    def send_message(self, msg, to_addrs=None):
+        """Send one message, lazily reconnecting if the server dropped us."""
+        self._before_send()
+        try:
+            self.server.send_message(msg, to_addrs=to_addrs)
+        except (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError,
+                ConnectionResetError):
+            # Server closed the connection (idle timeout, max messages per
+            # connection, a mid-write TCP reset, ...) — reconnect once and
+            # retry this recipient.
+            self.reconnect()
+            self.server.send_message(msg, to_addrs=to_addrs)
+
+        self._rset_quietly()
+
+    def send_raw(self, from_addr, recipient, raw):
+        """Send pre-serialized message bytes, with the same reconnect logic."""
+        self._before_send()
+        try:
+            _sendmail_pipelined(self.server, from_addr, recipient, raw)
+        except (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError,
+                ConnectionResetError):
+            self.reconnect()
+            _sendmail_pipelined(self.server, from_addr, recipient, raw)
+
+        self._rset_quietly()
+
+    def _rset_quietly(self):
+        # Cheap RSET between messages keeps the session state clean without
+        # tearing down the connection.
+        try:
+            self.server.rset()
+        except (smtplib.SMTPException, OSError):
+            pass
+
+
+class SmtpSession:
+    """Public session for sending several emails over one connection.
+
+    Thin wrapper over the internal pooled session with a (success, error)
+    result shape matching send_email, so callers like the GUI send thread
+    can keep their per-recipient error handling while paying for the
+    TLS+LOGIN handshake only once.
+    """
+
+    def __init__(self, smtp_config):
+        self.smtp_config = smtp_config
+        self._session = _SmtpSession(smtp_config)
+
+    def __enter__(self):
+        self._session.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        return self._session.__exit__(exc_type, exc_value, tb)
+
+    def send(self, recipient, subject, body, attachments=None, prebuilt_parts=None):
+        """Send one email on the open session; returns (success, error)."""
+        msg = create_email_message(
+            self.smtp_config, recipient, subject, body, attachments, prebuilt_parts
+        )
+        try:
+            self._session.send_message(msg, to_addrs=[recipient])
+            return True, None
+        except (smtplib.SMTPException, OSError, Exception) as e:
+            return False, str(e)
+
+    def send_serialized(self, recipient, raw_head, raw_body):
+        """Send pre-serialized campaign bytes to one recipient.
+
+        Pairs with serialize_template_message: the MIME tree is flattened
+        once per campaign and only the To placeholder is spliced here, so
+        per send there is no generator walk and no attachment encoding.
+        """
+        try:
+            # Spliced inside the handler: a non-ASCII recipient raises
+            # UnicodeEncodeError here and must fail this send, not the
+            # caller's whole run.
+            raw = _raw_for_recipient(raw_head, raw_body, recipient)
+            self._session.send_raw(self.smtp_config.get('email', ''), recipient, raw)
+            return True, None
+        except (smtplib.SMTPException, OSError, Exception) as e:
+            return False, str(e)
+
+
+# Below this size the stdlib path wins; pandas start-up cost dominates.
+_VECTORIZE_MIN_BYTES = 1 << 20
+
+
+def _csv_email_series(file_path):
+    """Return a pandas Series of the valid email cells in a CSV file.
+
+    Reads the file once with the C parser and applies the email regex as a
+    vectorized string operation, keeping the per-cell inner loop out of
+    Python entirely.
+    """
+    pd = _pandas()
+    with open(file_path, 'r', encoding='utf-8-sig', errors='ignore') as f:
+        delimiter = _sniff_delimiter(f)
+    frame = pd.read_csv(
+        file_path, header=None, dtype=str, sep=delimiter,
+        encoding='utf-8-sig', on_bad_lines='skip',
+    )
+    cells = frame.stack().str.strip()
+    return cells[cells.str.match(_EMAIL_RE)]
+
+
+def _sniff_delimiter(f):
+    """Pick the CSV delimiter from a sample and rewind the file.
+
+    Frequency counting over the first 8KB decides between the supported
+    delimiters in one cheap pass — re-parsing the whole file per
+    candidate delimiter parsed it three times in practice, because
+    csv.reader almost never raises on a merely-wrong delimiter.
+    """
+    sample = f.read(8192)
+    f.seek(0)
+    return max([',', ';', '\t'], key=sample.count)
+
+
+def _load_emails_csv_into(file_path, out):
+    """Accumulate the valid emails of a CSV file into the `out` set."""
+    if os.path.getsize(file_path) >= _VECTORIZE_MIN_BYTES:
+        if _pandas() is not None:
+            try:
+                out.update(_csv_email_series(file_path).tolist())
+                return
+            except Exception as e:
+                print(f"Vectorized CSV parse failed, using fallback: {e}")
+        else:
+            # No pandas: a single token-regex sweep over the raw bytes
+            # still beats the per-cell Python loop by a wide margin.
+            try:
+                with _mmap_readonly(file_path) as mm:
+                    if mm is not None:
+                        out.update(
+                            m.group().decode('ascii')
+                            for m in _EMAIL_TOKEN_RE.finditer(mm)
+                        )
+                return
+            except (IOError, OSError) as e:
+                print(f"Error loading CSV: {e}")
+                return
+
+    _match = _EMAIL_RE.match  # local binding for the per-cell hot loop
+    add = out.add
+    try:
+        with open(file_path, 'r', encoding='utf-8-sig', newline='', buffering=1 << 20) as f:
+            reader = csv.reader(f, delimiter=_sniff_delimiter(f))
+            for row in reader:
+                for item in row:
+                    # Clean cells (the common case) match without paying
+                    # for a strip() allocation first.
+                    if _match(item):
+                        add(item)
+                    else:
+                        item = item.strip()
+                        if item and _match(item):
+                            add(item)
+    except (IOError, OSError, csv.Error) as e:
+        print(f"Error loading CSV: {e}")
+
+
+def load_emails_from_csv(file_path):
+    """Load emails from CSV file with improved parsing."""
+    emails = set()
+    _load_emails_csv_into(file_path, emails)
+    return list(emails)
+
+
+# Below this size a single process wins; IPC overhead dominates.
+_PARALLEL_SCAN_MIN_BYTES = 16 << 20
+
+
+def _newline_aligned_ranges(file_path):
+    """Split a big file into per-core byte ranges aligned to line breaks.
+
+    Returns None when the file is too small (or the machine too narrow)
+    for multiprocessing to pay off.
+    """
+    try:
+        size = os.path.getsize(file_path)
+    except OSError:
+        return None
+    workers = os.cpu_count() or 1
+    if size < _PARALLEL_SCAN_MIN_BYTES or workers < 2:
+        return None
+
+    bounds = [0]
+    with open(file_path, 'rb') as f:
+        for i in range(1, workers):
+            f.seek(size * i // workers)
+            f.readline()  # advance to the next line boundary
+            bounds.append(min(f.tell(), size))
+    bounds.append(size)
+    return [
+        (start, end)
+        for start, end in zip(bounds, bounds[1:])
+        if end > start
+    ]
+
+
+def _count_emails_span(args):
+    """Worker: count email lines within one byte range of the file."""
+    file_path, start, end = args
+    with open(file_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return sum(1 for _ in _EMAIL_LINE_RE.finditer(mm, start, end))
+
+
+def _extract_emails_span(args):
+    """Worker: extract email addresses within one byte range of the file."""
+    file_path, start, end = args
+    with open(file_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return [
+                m.group(1).decode('ascii')
+                for m in _EMAIL_LINE_RE.finditer(mm, start, end)
+            ]
+
+
+@contextmanager
+def _mmap_readonly(file_path):
+    """Yield a read-only mmap of the file, or None when it is empty."""
+    with open(file_path, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # zero-length file cannot be mapped
+            yield None
+            return
+        with mm:
+            yield mm
+
+
+def _load_emails_txt_into(file_path, out):
+    """Accumulate the valid emails of a TXT file into the `out` set.
+
+    Scans a read-only mmap with the bytes line regex so only the matched
+    address spans are decoded, instead of allocating a str per line.
+    """
+    try:
+        ranges = _newline_aligned_ranges(file_path)
+        if ranges:
+            with ProcessPoolExecutor() as executor:
+                for chunk in executor.map(
+                    _extract_emails_span, [(file_path, s, e) for s, e in ranges]
+                ):
+                    out.update(chunk)
+            return
+        with _mmap_readonly(file_path) as mm:
+            if mm is not None:
+                out.update(m.group(1).decode('ascii') for m in _email_line_finditer(mm))
+    except (IOError, OSError) as e:
+        print(f"Error loading TXT: {e}")
+
+
+def load_emails_from_txt(file_path):
+    """Load emails from TXT file."""
+    emails = set()
+    _load_emails_txt_into(file_path, emails)
+    return list(emails)
+
+
+def load_emails(file_path):
+    """Load emails from CSV/TXT and validate format.
+
+    Accumulates straight into a set so duplicates never pile up in an
+    intermediate list; one final list() is the only materialization.
+    """
+    if not file_path or not os.path.exists(file_path):
+        return []
+
+    emails = set()
+    if file_path.lower().endswith('.csv'):
+        _load_emails_csv_into(file_path, emails)
+    else:
+        _load_emails_txt_into(file_path, emails)
+
+    return list(emails)
+
+
+def is_valid_email(email):
+    """Fast scalar `x@y.z` shape check without the regex engine.
+
+    This is the hottest per-item call when cleaning large lists; a couple
+    of find/rfind calls cost a fraction of a regex match. Callers that
+    need the full character-class rules use strict_is_valid_email.
+    """
+    if not email or not isinstance(email, str):
+        return False
+    at = email.find('@')
+    if at < 1 or at != email.rfind('@'):
+        return False
+    dot = email.rfind('.')
+    if not at + 1 < dot < len(email) - 1:
+        return False
+    # Whitespace (including CR/LF/TAB) plus the address-list and
+    # angle-bracket separators: any of these inside a RCPT TO envelope
+    # changes what the server sees as the recipient — CRLF outright
+    # injects a new SMTP command — so they are hard rejections even on
+    # the fast path.
+    return not any(c in email for c in ' \r\n\t,;<>')
+
+
+def strict_is_valid_email(email):
+    """Regex email validation (stricter character classes than the fast path).
+
+    Matches against the module-level compiled pattern — never a string
+    literal, which would re-hit re's cache lookup on every call.
+    """
+    if not email or not isinstance(email, str):
+        return False
+    return _EMAIL_RE.match(email) is not None
+
+
+# Base64 payloads cached by (path, mtime, size) so repeated campaigns (or
+# retries) with the same attachments skip the read+encode entirely.
+_ATTACH_CACHE = {}
+_ATTACH_CACHE_LOCK = threading.Lock()
+_ATTACH_CACHE_MAX = 32
+# Files above this size are encoded on demand but never cached: a handful
+# of large PDFs would otherwise pin hundreds of MB of base64 in memory.
+_ATTACH_CACHE_MAX_FILE_BYTES = 8 << 20
+
+
+def _b64_encode_wrapped(data):
+    """Base64-encode to MIME-wrapped lines with the fastest codec present.
+
+    pybase64 encodes at near-memcpy speed but emits one flat run, so the
+    76-column wrapping encodebytes does for free is re-added by slicing;
+    even with that pass it comfortably beats the scalar stdlib codec on
+    large attachments.
+    """
+    if pybase64 is None:
+        return base64.encodebytes(data)
+    flat = pybase64.b64encode(bytes(data))
+    if not flat:
+        return b''
+    return b'\n'.join(flat[i:i + 76] for i in range(0, len(flat), 76)) + b'\n'
+
+
+def _encoded_attachment_payload(file_path):
+    """Return the base64 payload for a file, cached by path+mtime+size.
+
+    The file is fed to the encoder through a read-only mmap, so no
+    intermediate full-file bytes object is allocated before encoding.
+    """
+    st = os.stat(file_path)
+    key = (file_path, st.st_mtime_ns, st.st_size)
+    with _ATTACH_CACHE_LOCK:
+        cached = _ATTACH_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    if st.st_size == 0:
+        encoded = b''
+    else:
+        with open(file_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                encoded = _b64_encode_wrapped(mm)
+
+    if st.st_size > _ATTACH_CACHE_MAX_FILE_BYTES:
+        return encoded
+    with _ATTACH_CACHE_LOCK:
+        if len(_ATTACH_CACHE) >= _ATTACH_CACHE_MAX:
+            _ATTACH_CACHE.clear()
+        _ATTACH_CACHE[key] = encoded
+    return encoded
+
+
+def build_attachment_parts(attachments):
+    """Build fully-encoded MIME parts for a list of attachment paths.
+
+    The read+base64 work happens here exactly once; a caller sending to
+    many recipients builds the parts up front and attaches the same
+    objects to every message instead of re-encoding per send.
+    """
+    parts = []
+    for file_path in attachments or []:
+        # EAFP: no exists() pre-check — the stat inside the payload
+        # helper both keys the cache and surfaces missing files.
+        try:
+            part = MIMEBase('application', "octet-stream")
+            part.set_payload(_encoded_attachment_payload(file_path))
+            # Payload is pre-encoded; just declare the encoding
+            # instead of running encoders.encode_base64 again.
+            part.add_header('Content-Transfer-Encoding', 'base64')
+            filename = os.path.basename(file_path)
+            part.add_header('Content-Disposition', f'attachment; filename="{filename}"')
+            parts.append(part)
+        except (IOError, OSError) as e:
+            print(f"Attachment error: {e}")
+    return parts
+
+
+def build_template_message(smtp_config, subject, body, attachments=None, prebuilt_parts=None):
+    """Build the recipient-independent MIME message for a campaign.
+
+    Body and attachments are identical for every recipient of a bulk
+    send, so the tree (including the base64-encoded attachments) should
+    be built exactly once and only the To header swapped per send.
+    Callers that already hold encoded parts pass prebuilt_parts to skip
+    the attachment work entirely.
+    """
+    msg = MIMEMultipart("related")
+    msg['From'] = smtp_config['email']
+    msg['Subject'] = subject
+
+    alt = MIMEMultipart("alternative")
+    msg.attach(alt)
+
+    alt.attach(MIMEText("This is an HTML email. Please view in HTML capable client.", "plain"))
+    alt.attach(MIMEText(body, "html"))
+
+    if prebuilt_parts is None:
+        prebuilt_parts = build_attachment_parts(attachments)
+    for part in prebuilt_parts:
+        msg.attach(part)
+    return msg
+
+
+def _set_recipient(msg, recipient):
+    """Point a template message at one recipient."""
+    if 'To' in msg:
+        del msg['To']
+    msg['To'] = recipient
+
+
+# Placeholder address baked into the pre-serialized headers; never appears
+# in real traffic ('.invalid' is a reserved TLD).
+_TO_PLACEHOLDER = 'bulk-send-to@placeholder.invalid'
+
+
+def serialize_template_message(msg):
+    """Serialize a template message to wire bytes exactly once.
+
+    Returns (raw_head, raw_body): the header block contains the To
+    placeholder, the body is everything after the first blank line. Per
+    recipient only the placeholder is substituted in the (small) header
+    block — the MIME tree is never walked or base64-encoded again.
+    """
+    _set_recipient(msg, _TO_PLACEHOLDER)
+    raw = msg.as_bytes(policy=email_policy.SMTP)
+    raw_head, _, raw_body = raw.partition(b'\r\n\r\n')
+    return raw_head, raw_body
+
+
+def _raw_for_recipient(raw_head, raw_body, recipient):
+    """Splice one recipient into the pre-serialized message bytes."""
+    head = raw_head.replace(_TO_PLACEHOLDER.encode('ascii'), recipient.encode('ascii'))
+    return head + b'\r\n\r\n' + raw_body
+
+
+def create_email_message(smtp_config, recipient, subject, body, attachments=None, prebuilt_parts=None):
+    """Create a MIME email message with optional attachments."""
+    msg = build_template_message(smtp_config, subject, body, attachments, prebuilt_parts)
+    _set_recipient(msg, recipient)
+    return msg
+
+
+def send_batch(smtp_config, recipients, subject, body, attachments=None):
+    """Send one identical message to many recipients in one transaction.
+
+    A single MAIL FROM + N RCPT TO + one DATA: the body and attachments
+    cross the wire once no matter how many recipients the batch carries,
+    which is the true bulk-newsletter shape. Recipients appear only in
+    the envelope (the To header carries the sender, undisclosed-
+    recipients style). Returns {recipient: (success, error)} with
+    per-recipient refusals broken out.
+    """
+    recipients = list(recipients)
+    if not recipients:
+        return {}
+    from_addr = smtp_config.get('email', '')
+    msg = build_template_message(smtp_config, subject, body, attachments)
+    _set_recipient(msg, from_addr)
+    raw = msg.as_bytes(policy=email_policy.SMTP)
+
+    try:
+        with _POOL.acquire(smtp_config) as server:
+            mail_options = (
+                ['BODY=8BITMIME'] if server.has_extn('8bitmime') else []
+            )
+            refused = server.sendmail(
+                from_addr, recipients, raw, mail_options=mail_options
+            )
+    except smtplib.SMTPRecipientsRefused as e:
+        refused = e.recipients
+    except (smtplib.SMTPException, OSError, Exception) as e:
+        error = str(e)
+        return {recipient: (False, error) for recipient in recipients}
+
+    results = {}
+    for recipient in recipients:
+        if recipient in refused:
+            code, resp = refused[recipient]
+            if isinstance(resp, bytes):
+                resp = resp.decode('utf-8', 'replace')
+            results[recipient] = (False, f"{code} {resp}")
+        else:
+            results[recipient] = (True, None)
+    return results
+
+
+def send_serialized(smtp_config, recipient, raw_head, raw_body):
+    """Send pre-serialized campaign bytes over a pooled connection.
+
+    Standalone counterpart of SmtpSession.send_serialized for callers
+    (e.g. worker-pool tasks) that borrow a connection per send instead of
+    holding one open.
+    """
+    from_addr = smtp_config.get('email', '')
+    try:
+        raw = _raw_for_recipient(raw_head, raw_body, recipient)
+        with _POOL.acquire(smtp_config) as server:
+            _sendmail_pipelined(server, from_addr, recipient, raw)
+        return True, None
+    except (smtplib.SMTPException, OSError, Exception) as e:
+        return False, str(e)
+
+
+def send_email(smtp_config, recipient, subject, body, attachments=None, prebuilt_parts=None):
+    """Send a single email over a pooled connection."""
+    msg = create_email_message(smtp_config, recipient, subject, body, attachments, prebuilt_parts)
+
+    try:
+        with _POOL.acquire(smtp_config) as server:
+            server.send_message(msg)
+        return True, None
+    except (smtplib.SMTPException, OSError, Exception) as e:
+        return False, str(e)
+
+
+# SMTP codes that signal transient throttling rather than a hard failure.
+_THROTTLE_CODES = (421, 450, 451, 452, 454)
+
+
+def _is_throttle_error(error):
+    """True if the SMTP failure is the server asking us to slow down.
+
+    MAIL/DATA-level 4xx replies arrive as SMTPResponseException (or its
+    subclasses) carrying smtp_code, but a 4xx on RCPT TO — the most
+    common way providers signal throttling — comes wrapped in
+    SMTPRecipientsRefused, whose per-recipient reply codes have to be
+    inspected instead.
+    """
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code in _THROTTLE_CODES
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return any(
+            code in _THROTTLE_CODES for code, _ in error.recipients.values()
+        )
+    return False
+
+# Reply codes appear either leading the message ("450 try later") or as
+# exception tuples ("(450, b'try later')"); anchoring avoids matching
+# stray numbers like port 465 in the message text.
+_TRANSIENT_ERROR_RE = re.compile(r'(?:^|\()(4\d\d)\b')
+_TRANSIENT_ERROR_HINTS = ('timed out', 'connection reset', 'connection unexpectedly closed')
+
+
+def is_transient_smtp_error(error):
+    """Return True if a stringified send error looks worth retrying.
+
+    The send helpers report failures as strings, so callers deciding
+    whether to retry only have the text to go on: a 4xx reply code means
+    the server asked us to come back later, and timeouts or resets are
+    network weather. 5xx codes (bad recipient, auth failure, policy
+    rejection) will fail identically on every attempt.
+    """
+    if not error:
+        return False
+    match = _TRANSIENT_ERROR_RE.search(error)
+    if match:
+        return True
+    lowered = error.lower()
+    return any(hint in lowered for hint in _TRANSIENT_ERROR_HINTS)
+
+
+class RateLimiter:
+    """Token-bucket limiter matching provider messages-per-minute policies.
+
+    Jittered sleeps only bound the instantaneous gap between two sends;
+    a token bucket bounds the sustained rate, which is what providers
+    actually meter. Each send costs one token, tokens refill continuously
+    at rate_per_min, and a short burst up to the bucket capacity is
+    allowed after a quiet period. Thread-safe, so one limiter can be
+    shared by all workers of a parallel bulk send.
+    """
+
+    def __init__(self, rate_per_min, burst=None):
+        self.rate = rate_per_min / 60.0
+        self.capacity = burst if burst is not None else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a send token is available, then consume it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._last) * self.rate
+                )
+                self._last = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class _AdaptiveThrottle:
+    """Exponential backoff that engages only when the server throttles.
+
+    Most providers accept back-to-back sends on an authenticated session;
+    a fixed sleep per recipient just wastes wall time. This starts at zero
+    delay, doubles (capped) whenever a 4xx throttle response comes back,
+    and resets after a run of consecutive successes.
+    """
+
+    RESET_AFTER = 5  # consecutive successes that clear the backoff
+
+    def __init__(self, base=1.0, cap=60.0):
+        self.base = base
+        self.cap = cap
+        self._delay = 0.0
+        self._streak = 0
+
+    def active(self):
+        return self._delay > 0
+
+    def record_success(self):
+        self._streak += 1
+        if self._streak >= self.RESET_AFTER:
+            self._delay = 0.0
+
+    def record_throttle(self):
+        self._streak = 0
+        self._delay = self.base if self._delay == 0 else min(self._delay * 2, self.cap)
+
+    def wait(self):
+        if self._delay > 0:
+            time.sleep(self._delay)
+
+
+# Each pool worker thread backs off independently: one throttled worker
+# slowing down must not stall its siblings.
+_worker_state = threading.local()
+
+
+def _worker_throttle():
+    throttle = getattr(_worker_state, 'throttle', None)
+    if throttle is None:
+        throttle = _worker_state.throttle = _AdaptiveThrottle()
+    return throttle
+
+
+def _send_one_pooled(smtp_config, from_addr, recipient, raw_head, raw_body, delay_range, retry_failed, limiter=None):
+    """Send to one recipient over a pooled connection; returns its log entries.
+
+    Works on the shared pre-serialized campaign bytes, which are immutable
+    and therefore safe to splice concurrently from many workers. The
+    sender address comes in pre-resolved so nothing re-hashes smtp_config
+    per recipient.
+    """
+    entries = []
+    try:
+        raw = _raw_for_recipient(raw_head, raw_body, recipient)
+    except UnicodeEncodeError as e:
+        # Non-ASCII recipient: fails this entry only (a retry cannot
+        # help), instead of tearing down the whole campaign when
+        # future.result() re-raises.
+        entries.append((int(time.time()), recipient, f"Failed: {e}"))
+        return entries
+    throttle = _worker_throttle()
+    throttle.wait()
+    if limiter is not None:
+        limiter.acquire()
+    try:
+        with _POOL.acquire(smtp_config) as server:
+            _sendmail_pipelined(server, from_addr, recipient, raw)
+        success, error = True, None
+        throttle.record_success()
+    except (smtplib.SMTPException, OSError, Exception) as e:
+        success, error = False, str(e)
+        if _is_throttle_error(e):
+            throttle.record_throttle()
+    status = "Sent" if success else f"Failed: {error}"
+    entries.append((int(time.time()), recipient, status))
+
+    # Per-worker jitter keeps the aggregate rate provider-friendly.
+    if delay_range and delay_range[1] > 0:
+        time.sleep(random.uniform(*delay_range))
+
+    if retry_failed and not success:
+        if throttle.active():
+            throttle.wait()
+        else:
+            time.sleep(random.uniform(1, 3))
+        try:
+            with _POOL.acquire(smtp_config) as server:
+                _sendmail_pipelined(server, from_addr, recipient, raw)
+            success, error = True, None
+            throttle.record_success()
+        except (smtplib.SMTPException, OSError, Exception) as e:
+            success, error = False, str(e)
+            if _is_throttle_error(e):
+                throttle.record_throttle()
+        status = "Sent (Retry)" if success else f"Failed (Retry): {error}"
+        entries.append((int(time.time()), recipient, status))
+    return entries
+
+
+def bulk_send(smtp_config, email_list, subject, body, attachments=None, delay_range=(0, 0), retry_failed=True, max_workers=1, rate_per_min=None):
+    """Send emails in bulk over reused SMTP connections.
+
+    With max_workers=1 (the default) every recipient goes over one reused
+    session — each email only costs a DATA transaction instead of a full
+    TCP+TLS+LOGIN handshake. With max_workers>1 recipients are spread over
+    a thread pool whose workers draw connections from the module pool, so
+    network round-trips overlap until the provider's connection cap.
+
+    There is no fixed sleep between sends by default: the session backs
+    off exponentially only when the server answers with a throttling 4xx
+    code. Pass rate_per_min to hold a sustained token-bucket rate that
+    matches a provider cap (shared across workers), or a delay_range to
+    add fixed jitter on top.
+
+    Returns logs as three parallel lists {'timestamp', 'recipient',
+    'status'} — per-entry dicts cost ~4x the memory on large blasts.
+    Timestamps are epoch ints; export_logs_to_csv formats them on the
+    way out.
+    """
+    logs = {'timestamp': [], 'recipient': [], 'status': []}
+
+    def _log(entry_ts, entry_recipient, entry_status):
+        logs['timestamp'].append(entry_ts)
+        logs['recipient'].append(entry_recipient)
+        logs['status'].append(entry_status)
+
+    total = len(email_list)
+
+    # Built and serialized once for the whole campaign: per recipient only
+    # the To placeholder is spliced into the header bytes, so the MIME tree
+    # (and attachment encoding) is never re-walked.
+    msg = build_template_message(smtp_config, subject, body, attachments)
+    raw_head, raw_body = serialize_template_message(msg)
+    from_addr = smtp_config.get('email', '')
+    limiter = RateLimiter(rate_per_min) if rate_per_min else None
+
+    if max_workers > 1:
+        workers = min(max_workers, _SmtpPool.MAX_PER_KEY, total or 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    _send_one_pooled, smtp_config, from_addr, recipient,
+                    raw_head, raw_body, delay_range, retry_failed, limiter,
+                )
+                for recipient in email_list
+            ]
+            for future in futures:
+                for entry in future.result():
+                    _log(*entry)
+        return logs
+
+    throttle = _AdaptiveThrottle()
+    # Hoisted out of the loop: one tuple unpack and one bound method
+    # instead of a global lookup + unpack per recipient.
+    _uniform = random.uniform
+    delay_lo, delay_hi = delay_range if delay_range else (0, 0)
+    with _SmtpSession(smtp_config) as session:
+        for i, recipient in enumerate(email_list):
+            try:
+                raw = _raw_for_recipient(raw_head, raw_body, recipient)
+            except UnicodeEncodeError as e:
+                # Non-ASCII recipient: log it as this entry's failure
+                # rather than aborting the run and losing every log row
+                # accumulated so far.
+                _log(int(time.time()), recipient, f"Failed: {e}")
+                continue
+            if limiter is not None:
+                limiter.acquire()
+            try:
+                session.send_raw(from_addr, recipient, raw)
+                success, error = True, None
+                throttle.record_success()
+            except (smtplib.SMTPException, OSError) as e:
+                success, error = False, str(e)
+                if _is_throttle_error(e):
+                    throttle.record_throttle()
+            status = "Sent" if success else f"Failed: {error}"
+            _log(int(time.time()), recipient, status)
+
+            if i < total - 1:  # Don't sleep after the last email
+                throttle.wait()
+                if delay_hi > 0:
+                    time.sleep(_uniform(delay_lo, delay_hi))
+
+            if retry_failed and not success:
+                if throttle.active():
+                    throttle.wait()
+                else:
+                    time.sleep(_uniform(1, 3))
+                try:
+                    session.send_raw(from_addr, recipient, raw)
+                    success, error = True, None
+                    throttle.record_success()
+                except (smtplib.SMTPException, OSError) as e:
+                    success, error = False, str(e)
+                    if _is_throttle_error(e):
+                        throttle.record_throttle()
+                status = "Sent (Retry)" if success else f"Failed (Retry): {error}"
+                _log(int(time.time()), recipient, status)
+    return logs
+
+
+async def _async_send_one(sem, smtp_config, from_addr, recipient, raw):
+    """Send one pre-serialized message on its own async SMTP connection."""
+    host = smtp_config.get('server', '')
+    port = int(smtp_config.get('port', 0) or 0)
+    use_ssl = bool(smtp_config.get('ssl', port == 465))
+    use_tls = bool(smtp_config.get('tls', port != 465 and port != 25))
+    async with sem:
+        try:
+            client = aiosmtplib.SMTP(
+                hostname=host, port=port, use_tls=use_ssl,
+                start_tls=use_tls and not use_ssl, timeout=DEFAULT_TIMEOUT,
+            )
+            await client.connect()
+            try:
+                if smtp_config.get('email') and smtp_config.get('password'):
+                    await client.login(smtp_config['email'], smtp_config['password'])
+                await client.sendmail(from_addr, [recipient], raw)
+            finally:
+                try:
+                    await client.quit()
+                except aiosmtplib.SMTPException:
+                    pass
+            return recipient, True, None
+        except (aiosmtplib.SMTPException, OSError) as e:
+            return recipient, False, str(e)
+
+
+async def _async_send_all(smtp_config, email_list, raw_head, raw_body, concurrency):
+    sem = asyncio.Semaphore(concurrency)
+    from_addr = smtp_config.get('email', '')
+    tasks = [
+        _async_send_one(
+            sem, smtp_config, from_addr, recipient,
+            _raw_for_recipient(raw_head, raw_body, recipient),
+        )
+        for recipient in email_list
+    ]
+    return await asyncio.gather(*tasks)
+
+
+def async_bulk_send(smtp_config, email_list, subject, body, attachments=None, concurrency=5):
+    """Send a campaign with asyncio + aiosmtplib instead of threads.
+
+    Overlaps up to `concurrency` SMTP conversations on one event loop,
+    which scales to many pending connections without per-thread overhead.
+    Returns logs in the same shape as bulk_send. Requires the optional
+    aiosmtplib package.
+    """
+    if aiosmtplib is None:
+        raise RuntimeError("async_bulk_send requires the 'aiosmtplib' package")
+
+    msg = build_template_message(smtp_config, subject, body, attachments)
+    raw_head, raw_body = serialize_template_message(msg)
+    results = asyncio.run(
+        _async_send_all(smtp_config, email_list, raw_head, raw_body, concurrency)
+    )
+    timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+    logs = {'timestamp': [], 'recipient': [], 'status': []}
+    for recipient, success, error in results:
+        logs['timestamp'].append(timestamp)
+        logs['recipient'].append(recipient)
+        logs['status'].append("Sent" if success else f"Failed: {error}")
+    return logs
+
+
+_SEND_QUEUE = queue.Queue()
+_send_worker_lock = threading.Lock()
+_send_worker = None
+
+
+def _drain_send_queue():
+    """Worker loop: deliver queued emails over the pooled connections."""
+    while True:
+        item = _SEND_QUEUE.get()
+        try:
+            send_email(*item)
+        finally:
+            _SEND_QUEUE.task_done()
+
+
+def _ensure_send_worker():
+    """Start the background delivery thread on first use."""
+    global _send_worker
+    with _send_worker_lock:
+        if _send_worker is None or not _send_worker.is_alive():
+            _send_worker = threading.Thread(
+                target=_drain_send_queue, name="smtp-send-worker", daemon=True
+            )
+            _send_worker.start()
+
+
+def enqueue_send(smtp_config, recipient, subject, body, attachments=None):
+    """Queue one email for background delivery and return immediately.
+
+    Callers that cannot afford to block on the full TLS+SMTP round-trip
+    (e.g. UI handlers) push work here; a long-lived daemon thread drains
+    the queue using the pooled connections, so consecutive items reuse
+    the same session.
+    """
+    _ensure_send_worker()
+    _SEND_QUEUE.put((smtp_config, recipient, subject, body, attachments))
+
+
+def flush_send_queue():
+    """Block until every queued email has been processed."""
+    _SEND_QUEUE.join()
+
+
+def inline_image(file_path, width=400):
+    """Return HTML tag for inline newsletter image."""
+    if os.path.exists(file_path):
+        return f'<img src="file://{os.path.abspath(file_path)}" width="{width}"><br>'
+    return ""
+
+
+def save_template(name, subject, body, attachments=None):
+    """Save template locally as JSON."""
+    if not name.endswith(JSON_EXTENSION):
+        name += JSON_EXTENSION
+
+    filename = os.path.basename(name)
+    filepath = os.path.join(TEMPLATE_DIR, filename)
+
+    data = {
+        "name": filename,
+        "subject": subject,
+        "body": body,
+        "attachments": attachments or []
+    }
+    try:
+        with open(filepath, 'wb') as f:
+            f.write(_json_dumps(data))
+        _cache_template_saved(data)
+        return True
+    except (IOError, OSError, ValueError) as e:
+        print(f"Error saving template: {e}")
+        return False
+
+
+# Parsed-template cache, invalidated when the directory mtime changes
+# (every save/delete touches the directory). Spares the UI a listdir plus
+# a JSON parse per file on every lookup.
+_TPL_CACHE = {"mtime": -1, "templates": [], "by_name": {}}
+
+
+def _sync_template_cache_mtime():
+    """Record the directory mtime so our own write doesn't force a rescan."""
+    try:
+        _TPL_CACHE["mtime"] = os.stat(TEMPLATE_DIR).st_mtime_ns
+    except OSError:
+        _TPL_CACHE["mtime"] = -1
+
+
+def _cache_template_saved(data):
+    """Fold a just-saved template into the cache in place."""
+    if _TPL_CACHE["mtime"] == -1:
+        return  # never primed: the next load does a full scan anyway
+    by_name = _TPL_CACHE["by_name"]
+    name = data["name"]
+    if name in by_name:
+        _TPL_CACHE["templates"] = [
+            data if isinstance(t, dict) and t.get("name") == name else t
+            for t in _TPL_CACHE["templates"]
+        ]
+    else:
+        _TPL_CACHE["templates"].append(data)
+    by_name[name] = data
+    _sync_template_cache_mtime()
+
+
+def _cache_template_deleted(name):
+    """Drop a just-deleted template from the cache in place."""
+    if _TPL_CACHE["mtime"] == -1:
+        return  # never primed: the next load does a full scan anyway
+    if _TPL_CACHE["by_name"].pop(name, None) is not None:
+        _TPL_CACHE["templates"] = [
+            t for t in _TPL_CACHE["templates"]
+            if not (isinstance(t, dict) and t.get("name") == name)
+        ]
+    _sync_template_cache_mtime()
+
+
+def _refresh_template_cache():
+    """Re-read templates from disk only if TEMPLATE_DIR changed."""
+    try:
+        mtime = os.stat(TEMPLATE_DIR).st_mtime_ns
+    except OSError:
+        mtime = -1
+    if mtime != -1 and mtime == _TPL_CACHE["mtime"]:
+        return
+
+    templates = []
+    try:
+        for f in os.listdir(TEMPLATE_DIR):
+            if f.endswith(JSON_EXTENSION):
+                path = os.path.join(TEMPLATE_DIR, f)
+                with open(path, 'rb') as file:
+                    template_data = _json_loads(file.read())
+                    templates.append(template_data)
+    except (IOError, OSError, ValueError) as e:
+        print(f"Error loading templates: {e}")
+    _TPL_CACHE["templates"] = templates
+    _TPL_CACHE["by_name"] = {
+        t["name"]: t for t in templates if isinstance(t, dict) and "name" in t
+    }
+    _TPL_CACHE["mtime"] = mtime
+
+
+def _copy_template(template):
+    """Shallow-copy a cached template so callers cannot mutate the cache.
+
+    The GUI assigns template["attachments"] to its working lists and
+    extends them in place; handing out the cache's own dicts would let
+    those edits leak back into _TPL_CACHE and get persisted by the next
+    save.
+    """
+    return {**template, "attachments": list(template.get("attachments", []))}
+
+
+def load_templates():
+    """Load all saved templates (cached until the directory changes)."""
+    _refresh_template_cache()
+    return [_copy_template(t) for t in _TPL_CACHE["templates"]]
+
+
+def delete_template(name):
+    """Delete a saved template."""
+    if not name.endswith(JSON_EXTENSION):
+        name += JSON_EXTENSION
+
+    path = os.path.join(TEMPLATE_DIR, name)
+    # EAFP: remove directly instead of stat-then-remove (two syscalls and
+    # a race window where one suffices).
+    try:
+        os.remove(path)
+        _cache_template_deleted(name)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def get_template_by_name(name):
+    """Get a specific template by name (O(1) from the cache).
+
+    The template name doubles as its filename, so a cache miss costs one
+    direct open instead of a directory rescan — this also finds files
+    dropped into TEMPLATE_DIR by another process between stat ticks.
+    """
+    _refresh_template_cache()
+    template = _TPL_CACHE["by_name"].get(name)
+    if template is not None:
+        return _copy_template(template)
+
+    filename = name if name.endswith(JSON_EXTENSION) else name + JSON_EXTENSION
+    path = os.path.join(TEMPLATE_DIR, os.path.basename(filename))
+    try:
+        with open(path, 'rb') as f:
+            return _json_loads(f.read())
+    except (IOError, OSError, ValueError):
+        return None
+
+
+# Recent validation results, keyed on a config fingerprint. Debounces UI
+# double-clicks so "Validate" then "Send" costs one handshake, not two.
+_VALIDATION_TTL = 60  # seconds
+_PING_TIMEOUT = 4  # reachability checks should fail fast
+_VALIDATION_CACHE = {}
+_validation_lock = threading.Lock()
+
+
+def _validation_key(smtp_config):
+    # In-process hash of the password, never the password itself.
+    return (_SmtpPool._key(smtp_config), hash(smtp_config.get('password', '')))
+
+
+def ping_smtp(smtp_config):
+    """Check that the SMTP server is reachable: connect + EHLO + QUIT.
+
+    Skips LOGIN entirely — cheaper than a full validation and avoids
+    burning auth attempts (or lockouts) when the caller only cares about
+    reachability.
+    """
+    try:
+        server = _connect_smtp(smtp_config, timeout=_PING_TIMEOUT)
+        try:
+            server.quit()
+        except smtplib.SMTPException:
+            pass
+        return True, "SMTP server is reachable"
+    except (smtplib.SMTPException, OSError, Exception) as e:
+        return False, f"SMTP ping failed: {str(e)}"
+
+
+def auth_smtp(smtp_config):
+    """Validate reachability plus LOGIN with the configured credentials."""
+    server = None
+    try:
+        server = _connect_smtp(smtp_config)
+        if smtp_config.get('email') and smtp_config.get('password'):
+            server.login(smtp_config['email'], smtp_config['password'])
+        try:
+            server.noop()
+        except smtplib.SMTPException:
+            pass
+        return True, "SMTP configuration is valid"
+    except (smtplib.SMTPException, OSError, Exception) as e:
+        return False, f"SMTP validation failed: {str(e)}"
+    finally:
+        try:
+            if server:
+                server.quit()
+        except smtplib.SMTPException:
+            pass
+
+
+def peek_validation(smtp_config):
+    """Return a fresh cached validation result, or None. Never touches
+    the network — UI callers use this to skip spawning a worker thread
+    when Validate was clicked moments before Send.
+    """
+    key = _validation_key(smtp_config)
+    with _validation_lock:
+        cached = _VALIDATION_CACHE.get(key)
+    if cached and time.monotonic() - cached[0] < _VALIDATION_TTL:
+        return cached[1]
+    return None
+
+
+def validate_smtp_config(smtp_config):
+    """Validate SMTP configuration (cached for a short TTL).
+
+    Performs the full LOGIN check when credentials are configured and a
+    plain reachability ping otherwise; either way a fresh cached result
+    is returned without touching the network.
+    """
+    key = _validation_key(smtp_config)
+    now = time.monotonic()
+    with _validation_lock:
+        cached = _VALIDATION_CACHE.get(key)
+        if cached and now - cached[0] < _VALIDATION_TTL:
+            return cached[1]
+
+    if smtp_config.get('email') and smtp_config.get('password'):
+        result = auth_smtp(smtp_config)
+    else:
+        result = ping_smtp(smtp_config)
+
+    with _validation_lock:
+        _VALIDATION_CACHE[key] = (time.monotonic(), result)
+    return result
+
+
+def _format_log_timestamp(ts):
+    """Render an epoch-int log timestamp; pass pre-formatted strings through."""
+    if isinstance(ts, (int, float)):
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
+    return ts
+
+
+def _iter_log_rows(logs):
+    """Yield (timestamp, recipient, status) rows from either log layout.
+
+    Accepts both the parallel-lists layout produced by bulk_send and the
+    older list-of-dicts layout still used by callers that build entries
+    one at a time.
+    """
+    if isinstance(logs, dict):
+        rows = zip(logs['timestamp'], logs['recipient'], logs['status'])
+    else:
+        rows = ((log['timestamp'], log['recipient'], log['status']) for log in logs)
+    for ts, recipient, status in rows:
+        yield _format_log_timestamp(ts), recipient, status
+
+
+LOG_DIR = "logs"
+SESSION_LOG_FILE = os.path.join(LOG_DIR, "session_logs.csv")
+SESSION_LOG_BACKUP = os.path.join(LOG_DIR, "session_logs.prev.csv")
+_session_log_started = False
+_session_log_lock = threading.Lock()
+
+
+def _rotate_session_log(filename):
+    """Move a previous run's session log aside on this process's first append.
+
+    Keeps the live file scoped to the current app session — without this
+    it grows forever and Export Logs silently copies every past session's
+    rows along with the current one. The displaced file survives one more
+    session as SESSION_LOG_BACKUP.
+    """
+    global _session_log_started
+    with _session_log_lock:
+        if _session_log_started:
+            return
+        _session_log_started = True
+        if filename == SESSION_LOG_FILE and os.path.exists(filename):
+            if os.path.getsize(filename) > 0:
+                os.replace(filename, SESSION_LOG_BACKUP)
+            else:
+                os.remove(filename)
+
+
+def append_logs_to_csv(logs, filename=SESSION_LOG_FILE):
+    """Append log rows to a CSV file, creating it (with header) if needed.
+
+    Backs the session log: each finished run streams its rows here so
+    the GUI never has to hold a whole day's worth of log entries in
+    memory, and the rows survive a crash. The first append of the process
+    rotates any leftover file from an earlier session out of the way.
+    """
+    try:
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        _rotate_session_log(filename)
+        new_file = not os.path.exists(filename) or os.path.getsize(filename) == 0
+        with open(filename, 'a', newline='', encoding='utf-8', buffering=1 << 20) as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(['timestamp', 'recipient', 'status'])
+            writer.writerows(_iter_log_rows(logs))
+        return True
+    except (IOError, OSError) as e:
+        print(f"Error appending logs: {e}")
+        return False
+
+
+def export_logs_to_csv(logs, filename):
+    """Export logs to a CSV file.
+
+    Rows go out through writerows over a 1MB write buffer, so the export
+    is one C-level loop and a handful of write syscalls rather than a
+    Python call (and flush candidate) per log entry.
+    """
+    try:
+        with open(filename, 'w', newline='', encoding='utf-8', buffering=1 << 20) as f:
+            writer = csv.writer(f)
+            writer.writerow(['timestamp', 'recipient', 'status'])
+            writer.writerows(_iter_log_rows(logs))
+        return True
+    except (IOError, OSError) as e:
+        print(f"Error exporting logs: {e}")
+        return False
+
+
+def clean_email_list(email_list):
+    """Clean and validate a list of email addresses (order-preserving).
+
+    Dedup happens during the single pass — a dict rather than a set so
+    the caller's ordering survives (the GUI shows this list verbatim).
+    """
+    cleaned_emails = {}
+    for email in email_list:
+        if isinstance(email, str):
+            email = email.strip()
+            if is_valid_email(email):
+                cleaned_emails[email] = None
+    return list(cleaned_emails)
+
+
+def count_emails_in_file(file_path):
+    """Count valid emails in a file without loading them all."""
+    if not file_path or not os.path.exists(file_path):
+        return 0
+
+    try:
+        if file_path.lower().endswith('.csv'):
+            return _count_emails_csv(file_path)
+        else:
+            return _count_emails_txt(file_path)
+    except (IOError, OSError) as e:
+        print(f"Error counting emails: {e}")
+        return 0
+
+
+def _count_emails_csv(file_path):
+    """Count emails in CSV file with improved parsing."""
+    if os.path.getsize(file_path) >= _VECTORIZE_MIN_BYTES:
+        if _pandas() is not None:
+            try:
+                return int(_csv_email_series(file_path).size)
+            except Exception as e:
+                print(f"Vectorized CSV count failed, using fallback: {e}")
+        else:
+            try:
+                with _mmap_readonly(file_path) as mm:
+                    if mm is None:
+                        return 0
+                    return sum(1 for _ in _EMAIL_TOKEN_RE.finditer(mm))
+            except (IOError, OSError) as e:
+                print(f"Error counting CSV emails: {e}")
+                return 0
+
+    count = 0
+    _match = _EMAIL_RE.match  # local binding for the per-cell hot loop
+    try:
+        with open(file_path, 'r', encoding='utf-8-sig', newline='', buffering=1 << 20) as f:
+            reader = csv.reader(f, delimiter=_sniff_delimiter(f))
+            for row in reader:
+                for item in row:
+                    if _match(item):
+                        count += 1
+                    else:
+                        item = item.strip()
+                        if item and _match(item):
+                            count += 1
+    except (IOError, OSError, csv.Error) as e:
+        print(f"Error counting CSV emails: {e}")
+    return count
+
+
+def _count_emails_txt(file_path):
+    """Count emails in text file via mmap, without decoding any lines."""
+    count = 0
+    try:
+        ranges = _newline_aligned_ranges(file_path)
+        if ranges:
+            with ProcessPoolExecutor() as executor:
+                return sum(
+                    executor.map(
+                        _count_emails_span, [(file_path, s, e) for s, e in ranges]
+                    )
+                )
+        with _mmap_readonly(file_path) as mm:
+            if mm is not None:
+                count = sum(1 for _ in _email_line_finditer(mm))
+    except (IOError, OSError) as e:
+        print(f"Error counting TXT emails: {e}")
+    return count